@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class SafetyAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'safety_app'
+
+    def ready(self):
+        from . import signals  # noqa: F401
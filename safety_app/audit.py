@@ -0,0 +1,44 @@
+# safety_app/audit.py
+from contextvars import ContextVar
+from .models import AuditLog
+
+# Audit rows queued by the current request; None outside a request
+_pending = ContextVar('pending_audit_logs', default=None)
+
+# Rows per INSERT when a request's audit log entries are flushed
+AUDIT_FLUSH_BATCH_SIZE = 200
+
+
+class AuditBuffer:
+    """Collects informational audit log entries and writes them once per request"""
+    
+    @staticmethod
+    def add(**fields):
+        entry = AuditLog(**fields)
+        events = _pending.get()
+        if events is None:
+            # Not inside a request (shell, worker): write straight away
+            entry.save()
+        else:
+            events.append(entry)
+        return entry
+    
+    @staticmethod
+    def start():
+        return _pending.set([])
+    
+    @staticmethod
+    def stop(token):
+        """Close the request's buffer and return the entries it collected"""
+        events = _pending.get()
+        _pending.reset(token)
+        return events
+    
+    @staticmethod
+    def write(events):
+        if events:
+            AuditLog.objects.bulk_create(events, batch_size=AUDIT_FLUSH_BATCH_SIZE)
+    
+    @staticmethod
+    def flush(token):
+        AuditBuffer.write(AuditBuffer.stop(token))
@@ -1,13 +1,159 @@
 # safety_app/consumers.py
-import json
+import asyncio
+import uuid
+from collections import defaultdict
+from typing import Optional
+
+import msgspec
+import numpy as np
 from channels.generic.websocket import AsyncWebsocketConsumer
-from channels.db import database_sync_to_async
+from channels.layers import InMemoryChannelLayer
 from django.contrib.auth.models import User
-from .models import Alert, LocationTrack, AuditLog
-from decimal import Decimal
-from datetime import datetime
+from django.core.cache import cache
+from django.db.models import Exists, OuterRef, Q
+from django.db.models.functions import Now
+from .models import Alert, LocationTrack, AuditLog, UserProfile, EmergencyContact
+from .services import (
+    ACTIVE_ALERT_CACHE_TTL, EARTH_RADIUS_METERS, GeoSpatialService, active_alert_key
+)
+
+# Shared codec instances; msgspec encodes UUIDs natively and reuses its
+# internal buffers across calls, so one pair serves every connection.
+_json_encoder = msgspec.json.Encoder()
+_json_decoder = msgspec.json.Decoder()
+
+
+def _dumps(obj):
+    return _json_encoder.encode(obj).decode()
+
+
+_loads = _json_decoder.decode
+
+# Clients that offer this subprotocol get MessagePack binary frames instead
+# of JSON text frames.
+MSGPACK_SUBPROTOCOL = 'msgpack'
+_msgpack_encoder = msgspec.msgpack.Encoder()
+_msgpack_decoder = msgspec.msgpack.Decoder()
+
+
+# Outbound message envelopes. The ``type`` key is the struct tag and is
+# always encoded first; fields left at their default are omitted.
+class Message(msgspec.Struct, tag_field='type', kw_only=True, omit_defaults=True):
+    pass
+
+
+class ConnectionEstablishedMsg(Message, tag='connection_established'):
+    message: str
+
+
+class ErrorMsg(Message, tag='error'):
+    message: str
+    alert_id: Optional[str] = None
+
+
+class LocationSavedMsg(Message, tag='location_saved'):
+    data: dict
+
+
+class AlertTriggeredMsg(Message, tag='alert_triggered'):
+    alert: dict
+
+
+class AlertCancelledMsg(Message, tag='alert_cancelled'):
+    message: str
+    alert_id: Optional[str] = None
+
+
+class SafeWordResultMsg(Message, tag='safe_word_result'):
+    valid: bool
+    alert_id: Optional[str] = None
+
+
+class LocationUpdateMsg(Message, tag='location_update'):
+    location: dict
+
+
+class AlertStatusMsg(Message, tag='alert_status'):
+    alert: Optional[dict]
 
-class AlertConsumer(AsyncWebsocketConsumer):
+
+_CONNECTION_ESTABLISHED = ConnectionEstablishedMsg(message='Connected to alert system')
+
+# Location tracks are buffered per connection and written in bulk once this
+# many points are queued or the interval (seconds) elapses, whichever is first.
+LOCATION_FLUSH_SIZE = 16
+LOCATION_FLUSH_INTERVAL = 2
+
+# Only every Nth location update gets a LOCATION_UPDATED audit entry (plus the
+# first one and any safe-zone transition); LocationTrack keeps every point.
+LOCATION_AUDIT_INTERVAL = 60
+
+# Monitor snapshots are cached briefly so a burst of monitors joining the same
+# alert costs one query; writes to the alert drop the entry.
+ALERT_DATA_CACHE_TTL = 2
+
+
+def _alert_data_key(alert_id):
+    return f'alert_data:{alert_id}'
+
+# Monitor consumers connected to this process, keyed by group name. Location
+# updates reach them directly instead of round-tripping the channel layer.
+_local_monitors = defaultdict(set)
+
+# Tags channel-layer broadcasts from this process so local monitors, which
+# were already served directly, ignore the copy that comes back.
+_PROCESS_ID = uuid.uuid4().hex
+
+
+def _encode_frame(payload, use_msgpack):
+    if use_msgpack:
+        return _msgpack_encoder.encode(payload)
+    return _dumps(payload)
+
+
+async def _send_to_local_monitors(group_name, message):
+    """Deliver a message to this process's monitors, encoding it once per wire format"""
+    frames = {}
+    for monitor in list(_local_monitors.get(group_name, ())):
+        if monitor.use_msgpack not in frames:
+            frames[monitor.use_msgpack] = _encode_frame(message, monitor.use_msgpack)
+        try:
+            await monitor.send_frame(frames[monitor.use_msgpack])
+        except Exception as e:
+            # A broken monitor socket must not fail the sender's connection
+            print(f"Error sending to monitor: {e}")
+            monitors = _local_monitors.get(group_name)
+            if monitors is not None:
+                monitors.discard(monitor)
+                if not monitors:
+                    del _local_monitors[group_name]
+
+
+class MessageCodecMixin:
+    """Negotiates the wire format (JSON text or MessagePack binary) per connection"""
+
+    use_msgpack = False
+
+    async def accept_with_codec(self):
+        self.use_msgpack = MSGPACK_SUBPROTOCOL in self.scope.get('subprotocols', [])
+        await self.accept(subprotocol=MSGPACK_SUBPROTOCOL if self.use_msgpack else None)
+
+    async def send_message(self, payload):
+        await self.send_frame(_encode_frame(payload, self.use_msgpack))
+
+    async def send_frame(self, frame):
+        if isinstance(frame, bytes):
+            await self.send(bytes_data=frame)
+        else:
+            await self.send(text_data=frame)
+
+    def decode_message(self, text_data=None, bytes_data=None):
+        if bytes_data is not None:
+            return _msgpack_decoder.decode(bytes_data)
+        return _loads(text_data)
+
+
+class AlertConsumer(MessageCodecMixin, AsyncWebsocketConsumer):
     async def connect(self):
         self.user = self.scope["user"]
         
@@ -16,20 +162,24 @@ class AlertConsumer(AsyncWebsocketConsumer):
             return
         
         self.alert_group_name = f'alert_{self.user.id}'
+        self.active_alert = None
+        # Loaded with the session user by ProfileModelBackend
+        self.profile = self.user.profile
+        await self.load_safe_zones()
+        self._loc_buffer = []
+        self._audit_buffer = []
+        self._flush_task = None
+        self._location_count = 0
+        self._last_in_safe_zone = None
         
-        # Join alert group
-        await self.channel_layer.group_add(
-            self.alert_group_name,
-            self.channel_name
+        # Join alert group while the handshake completes
+        await asyncio.gather(
+            self.channel_layer.group_add(self.alert_group_name, self.channel_name),
+            self.accept_with_codec()
         )
         
-        await self.accept()
-        
         # Send connection confirmation
-        await self.send(text_data=json.dumps({
-            'type': 'connection_established',
-            'message': 'Connected to alert system'
-        }))
+        await self.send_message(_CONNECTION_ESTABLISHED)
 
     async def disconnect(self, close_code):
         # Leave alert group
@@ -38,9 +188,15 @@ class AlertConsumer(AsyncWebsocketConsumer):
                 self.alert_group_name,
                 self.channel_name
             )
+        
+        # Write out any location tracks still waiting in the buffer
+        if hasattr(self, '_loc_buffer'):
+            await self.flush_location_buffer()
+            self.active_alert = None
+            self.profile = None
 
-    async def receive(self, text_data):
-        data = json.loads(text_data)
+    async def receive(self, text_data=None, bytes_data=None):
+        data = self.decode_message(text_data, bytes_data)
         message_type = data.get('type')
         
         if message_type == 'location_update':
@@ -60,10 +216,7 @@ class AlertConsumer(AsyncWebsocketConsumer):
         accuracy = data.get('accuracy')
         
         if not all([alert_id, latitude, longitude]):
-            await self.send(text_data=json.dumps({
-                'type': 'error',
-                'message': 'Missing required location data'
-            }))
+            await self.send_message(ErrorMsg(message='Missing required location data'))
             return
         
         # Save location track
@@ -73,21 +226,23 @@ class AlertConsumer(AsyncWebsocketConsumer):
         )
         
         if location_data:
-            # Broadcast to monitoring group
-            monitor_group = f'monitor_{alert_id}'
-            await self.channel_layer.group_send(
-                monitor_group,
-                {
-                    'type': 'location_broadcast',
-                    'location': location_data
-                }
-            )
+            # Broadcast to monitoring group: monitors in this process are
+            # sent to directly, the channel layer covers other workers
+            monitor_group = f'monitor_{self.active_alert.alert_id}'
+            await _send_to_local_monitors(monitor_group, LocationUpdateMsg(location=location_data))
+            
+            if not isinstance(self.channel_layer, InMemoryChannelLayer):
+                await self.channel_layer.group_send(
+                    monitor_group,
+                    {
+                        'type': 'location_broadcast',
+                        'location': location_data,
+                        'origin': _PROCESS_ID
+                    }
+                )
             
             # Send confirmation back to user
-            await self.send(text_data=json.dumps({
-                'type': 'location_saved',
-                'data': location_data
-            }))
+            await self.send_message(LocationSavedMsg(data=location_data))
 
     async def handle_alert_trigger(self, data):
         """Handle alert trigger from client"""
@@ -101,10 +256,7 @@ class AlertConsumer(AsyncWebsocketConsumer):
         )
         
         if alert_data:
-            await self.send(text_data=json.dumps({
-                'type': 'alert_triggered',
-                'alert': alert_data
-            }))
+            await self.send_message(AlertTriggeredMsg(alert=alert_data))
 
     async def handle_alert_cancel(self, data):
         """Handle alert cancellation"""
@@ -113,11 +265,14 @@ class AlertConsumer(AsyncWebsocketConsumer):
         
         success = await self.cancel_alert(alert_id, reason)
         
-        await self.send(text_data=json.dumps({
-            'type': 'alert_cancelled' if success else 'error',
-            'message': 'Alert cancelled successfully' if success else 'Failed to cancel alert',
-            'alert_id': alert_id
-        }))
+        if success:
+            await self.send_message(AlertCancelledMsg(
+                message='Alert cancelled successfully', alert_id=alert_id
+            ))
+        else:
+            await self.send_message(ErrorMsg(
+                message='Failed to cancel alert', alert_id=alert_id
+            ))
 
     async def handle_safe_word_check(self, data):
         """Verify safe word for alert cancellation"""
@@ -126,46 +281,50 @@ class AlertConsumer(AsyncWebsocketConsumer):
         
         is_valid = await self.verify_safe_word(alert_id, safe_word)
         
-        await self.send(text_data=json.dumps({
-            'type': 'safe_word_result',
-            'valid': is_valid,
-            'alert_id': alert_id
-        }))
+        await self.send_message(SafeWordResultMsg(valid=is_valid, alert_id=alert_id))
 
     # Database operations
-    @database_sync_to_async
-    def save_location_track(self, alert_id, lat, lon, accuracy, altitude, speed, heading):
+    async def save_location_track(self, alert_id, lat, lon, accuracy, altitude, speed, heading):
         try:
-            alert = Alert.objects.get(alert_id=alert_id, user=self.user)
+            alert = await self.get_active_alert(alert_id)
             
             # Check if location is in safe zone
-            is_in_safe_zone, nearest_zone = self.check_safe_zone(lat, lon)
+            is_in_safe_zone, nearest_zone_id = self.check_safe_zone(lat, lon)
             
-            track = LocationTrack.objects.create(
+            track = LocationTrack(
                 alert=alert,
-                latitude=Decimal(str(lat)),
-                longitude=Decimal(str(lon)),
+                latitude=lat,
+                longitude=lon,
                 accuracy=accuracy,
                 altitude=altitude,
                 speed=speed,
                 heading=heading,
                 is_in_safe_zone=is_in_safe_zone,
-                nearest_safe_zone=nearest_zone
+                nearest_safe_zone_id=nearest_zone_id
             )
+            self._loc_buffer.append(track)
             
-            # Create audit log
-            AuditLog.objects.create(
-                user=self.user,
-                alert=alert,
-                action='LOCATION_UPDATED',
-                description=f'Location updated: ({lat}, {lon})',
-                metadata={'accuracy': accuracy, 'in_safe_zone': is_in_safe_zone}
-            )
+            # Create audit log (sampled)
+            if (self._location_count % LOCATION_AUDIT_INTERVAL == 0
+                    or is_in_safe_zone != self._last_in_safe_zone):
+                self._audit_buffer.append(AuditLog(
+                    user=self.user,
+                    alert=alert,
+                    action='LOCATION_UPDATED',
+                    description=f'Location updated: ({lat}, {lon})',
+                    metadata={'accuracy': accuracy, 'in_safe_zone': is_in_safe_zone}
+                ))
+            self._location_count += 1
+            self._last_in_safe_zone = is_in_safe_zone
+            
+            if len(self._loc_buffer) >= LOCATION_FLUSH_SIZE:
+                await self.flush_location_buffer()
+            elif self._flush_task is None:
+                self._flush_task = asyncio.create_task(self._flush_after_interval())
             
             return {
-                'id': track.id,
-                'latitude': float(track.latitude),
-                'longitude': float(track.longitude),
+                'latitude': track.latitude,
+                'longitude': track.longitude,
                 'accuracy': track.accuracy,
                 'timestamp': track.timestamp.isoformat(),
                 'is_in_safe_zone': track.is_in_safe_zone
@@ -174,26 +333,61 @@ class AlertConsumer(AsyncWebsocketConsumer):
             print(f"Error saving location: {e}")
             return None
 
-    @database_sync_to_async
-    def create_alert(self, lat, lon, trigger_method, user_agent, ip_address):
+    async def get_active_alert(self, alert_id):
+        """Return the cached alert for this connection, fetching it only when alert_id differs"""
+        if self.active_alert is None or str(self.active_alert.alert_id) != str(alert_id):
+            self.active_alert = await Alert.objects.only(
+                'alert_id', 'user_id', 'status', 'safe_word_attempted', 'safe_word_success'
+            ).aget(alert_id=alert_id, user=self.user)
+        return self.active_alert
+
+    async def flush_location_buffer(self):
+        """Bulk insert buffered location tracks and their audit log entries"""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        
+        tracks, self._loc_buffer = self._loc_buffer, []
+        audit_logs, self._audit_buffer = self._audit_buffer, []
+        
         try:
-            alert = Alert.objects.create(
+            if tracks:
+                await LocationTrack.objects.abulk_create(tracks, batch_size=100)
+                latest = {track.alert_id: track.id for track in tracks}
+                for alert_id, track_id in latest.items():
+                    await Alert.objects.filter(alert_id=alert_id).aupdate(latest_track_id=track_id)
+                    await cache.adelete(_alert_data_key(alert_id))
+            if audit_logs:
+                await AuditLog.objects.abulk_create(audit_logs, batch_size=100)
+        except Exception as e:
+            print(f"Error flushing location buffer: {e}")
+
+    async def _flush_after_interval(self):
+        await asyncio.sleep(LOCATION_FLUSH_INTERVAL)
+        self._flush_task = None
+        await self.flush_location_buffer()
+
+    async def create_alert(self, lat, lon, trigger_method, user_agent, ip_address):
+        try:
+            alert = await Alert.objects.acreate(
                 user=self.user,
                 status='TRIGGERED',
                 trigger_method=trigger_method,
-                initial_latitude=Decimal(str(lat)) if lat else None,
-                initial_longitude=Decimal(str(lon)) if lon else None,
+                initial_latitude=float(lat) if lat is not None else None,
+                initial_longitude=float(lon) if lon is not None else None,
                 user_agent=user_agent,
                 ip_address=ip_address
             )
             
+            self.active_alert = alert
+            await cache.aset(active_alert_key(self.user.id), str(alert.alert_id), ACTIVE_ALERT_CACHE_TTL)
+            
             # Update user profile
-            profile = self.user.profile
-            profile.is_active_alert = True
-            profile.save()
+            self.profile.is_active_alert = True
+            await self.profile.asave(update_fields=['is_active_alert', 'updated_at'])
             
             # Create audit log
-            AuditLog.objects.create(
+            await AuditLog.objects.acreate(
                 user=self.user,
                 alert=alert,
                 action='ALERT_TRIGGERED',
@@ -204,7 +398,7 @@ class AlertConsumer(AsyncWebsocketConsumer):
             )
             
             return {
-                'alert_id': str(alert.alert_id),
+                'alert_id': alert.alert_id,
                 'status': alert.status,
                 'triggered_at': alert.triggered_at.isoformat()
             }
@@ -212,24 +406,30 @@ class AlertConsumer(AsyncWebsocketConsumer):
             print(f"Error creating alert: {e}")
             return None
 
-    @database_sync_to_async
-    def cancel_alert(self, alert_id, reason):
+    async def cancel_alert(self, alert_id, reason):
         try:
-            alert = Alert.objects.get(alert_id=alert_id, user=self.user)
-            alert.status = 'CANCELLED'
-            alert.cancelled_at = datetime.now()
-            alert.cancellation_reason = reason
-            alert.save()
+            updated = await Alert.objects.filter(alert_id=alert_id, user=self.user).aupdate(
+                status='CANCELLED',
+                cancelled_at=Now(),
+                cancellation_reason=reason,
+                updated_at=Now()
+            )
+            if not updated:
+                return False
+            
+            if self.active_alert is not None and str(self.active_alert.alert_id) == str(alert_id):
+                self.active_alert.status = 'CANCELLED'
+            await cache.adelete(_alert_data_key(alert_id))
+            await cache.adelete(active_alert_key(self.user.id))
             
             # Update user profile
-            profile = self.user.profile
-            profile.is_active_alert = False
-            profile.save()
+            self.profile.is_active_alert = False
+            await self.profile.asave(update_fields=['is_active_alert', 'updated_at'])
             
             # Create audit log
-            AuditLog.objects.create(
+            await AuditLog.objects.acreate(
                 user=self.user,
-                alert=alert,
+                alert_id=alert_id,
                 action='ALERT_CANCELLED',
                 description=f'Alert cancelled: {reason}',
                 metadata={'cancellation_reason': reason}
@@ -240,62 +440,89 @@ class AlertConsumer(AsyncWebsocketConsumer):
             print(f"Error cancelling alert: {e}")
             return False
 
-    @database_sync_to_async
-    def verify_safe_word(self, alert_id, safe_word):
+    async def verify_safe_word(self, alert_id, safe_word):
         try:
-            alert = Alert.objects.get(alert_id=alert_id, user=self.user)
-            profile = self.user.profile
+            alert = await self.get_active_alert(alert_id)
+            profile = self.profile
+            
+            # Re-read the digest; the safe word may have changed since connect
+            profile.safe_word_hash = await UserProfile.objects.filter(pk=profile.pk).values_list(
+                'safe_word_hash', flat=True
+            ).aget()
             
             alert.safe_word_attempted = True
             
-            if profile.safe_word and profile.safe_word.lower() == safe_word.lower():
+            update_fields = ['safe_word_attempted', 'safe_word_success', 'updated_at']
+            
+            if profile.check_safe_word(safe_word):
                 alert.safe_word_success = True
-                alert.save()
+                await alert.asave(update_fields=update_fields)
                 return True
             else:
-                alert.save()
+                await alert.asave(update_fields=update_fields)
                 return False
         except Exception as e:
             print(f"Error verifying safe word: {e}")
             return False
 
+    async def load_safe_zones(self):
+        """Cache the user's active safe zones as arrays for vectorised distance checks"""
+        rows = [
+            row async for row in self.user.safe_zones.filter(is_active=True).values_list(
+                'id', 'latitude', 'longitude', 'radius_meters'
+            )
+        ]
+        self._zone_ids = [row[0] for row in rows]
+        coords = np.array([row[1:] for row in rows], dtype=np.float64).reshape(-1, 3)
+        self._zone_lats = np.radians(coords[:, 0])
+        self._zone_lons = np.radians(coords[:, 1])
+        self._zone_radii = coords[:, 2]
+        
+        # Half-widths (radians) of each zone's bounding box. A point further
+        # than this in latitude or longitude cannot be inside the zone.
+        angular_radii = self._zone_radii / EARTH_RADIUS_METERS
+        self._zone_dlat = angular_radii
+        with np.errstate(divide='ignore'):
+            ratio = np.sin(angular_radii) / np.cos(self._zone_lats)
+        self._zone_dlon = np.where(ratio < 1, np.arcsin(np.minimum(ratio, 1)), np.pi)
+
     def check_safe_zone(self, lat, lon):
-        """Check if coordinates are within any safe zone using Haversine formula"""
-        from math import radians, sin, cos, sqrt, atan2
+        """Check if coordinates are within any cached safe zone using Haversine formula.
+
+        Zones whose bounding box excludes the point are skipped before any
+        trigonometry. Returns the id of the nearest zone containing the point.
+        """
+        if not self._zone_ids:
+            return False, None
         
-        safe_zones = self.user.safe_zones.filter(is_active=True)
+        lat_r = np.radians(float(lat))
+        lon_r = np.radians(float(lon))
+        dlon = np.abs((self._zone_lons - lon_r + np.pi) % (2 * np.pi) - np.pi)
+        candidates = np.flatnonzero(
+            (np.abs(self._zone_lats - lat_r) <= self._zone_dlat) & (dlon <= self._zone_dlon)
+        )
         
-        for zone in safe_zones:
-            # Haversine formula
-            R = 6371000  # Earth's radius in meters
-            
-            lat1 = radians(float(lat))
-            lon1 = radians(float(lon))
-            lat2 = radians(float(zone.latitude))
-            lon2 = radians(float(zone.longitude))
-            
-            dlat = lat2 - lat1
-            dlon = lon2 - lon1
-            
-            a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-            c = 2 * atan2(sqrt(a), sqrt(1-a))
-            distance = R * c
-            
-            if distance <= zone.radius_meters:
-                return True, zone
+        if not candidates.size:
+            return False, None
         
-        return False, None
+        distances = GeoSpatialService.haversine_distances(
+            lat, lon, self._zone_lats[candidates], self._zone_lons[candidates]
+        )
+        inside = distances <= self._zone_radii[candidates]
+        
+        if not inside.any():
+            return False, None
+        
+        idx = candidates[np.argmin(np.where(inside, distances, np.inf))]
+        return True, self._zone_ids[idx]
 
     # Receive from channel layer
     async def location_broadcast(self, event):
         """Broadcast location updates to monitoring clients"""
-        await self.send(text_data=json.dumps({
-            'type': 'location_update',
-            'location': event['location']
-        }))
+        await self.send_message(LocationUpdateMsg(location=event['location']))
 
 
-class MonitorConsumer(AsyncWebsocketConsumer):
+class MonitorConsumer(MessageCodecMixin, AsyncWebsocketConsumer):
     """Consumer for monitoring active alerts"""
     
     async def connect(self):
@@ -305,7 +532,12 @@ class MonitorConsumer(AsyncWebsocketConsumer):
             await self.close()
             return
         
-        self.alert_id = self.scope['url_route']['kwargs']['alert_id']
+        try:
+            self.alert_id = uuid.UUID(self.scope['url_route']['kwargs']['alert_id'])
+        except ValueError:
+            await self.close()
+            return
+        
         self.monitor_group_name = f'monitor_{self.alert_id}'
         
         # Verify user has permission to monitor this alert
@@ -315,61 +547,77 @@ class MonitorConsumer(AsyncWebsocketConsumer):
             await self.close()
             return
         
-        # Join monitoring group
-        await self.channel_layer.group_add(
-            self.monitor_group_name,
-            self.channel_name
+        # Join monitoring group while the handshake completes
+        await asyncio.gather(
+            self.channel_layer.group_add(self.monitor_group_name, self.channel_name),
+            self.accept_with_codec()
         )
-        
-        await self.accept()
+        _local_monitors[self.monitor_group_name].add(self)
         
         # Send current alert status
         alert_data = await self.get_alert_data()
-        await self.send(text_data=json.dumps({
-            'type': 'alert_status',
-            'alert': alert_data
-        }))
+        await self.send_message(AlertStatusMsg(alert=alert_data))
 
     async def disconnect(self, close_code):
         if hasattr(self, 'monitor_group_name'):
+            monitors = _local_monitors.get(self.monitor_group_name)
+            if monitors is not None:
+                monitors.discard(self)
+                if not monitors:
+                    del _local_monitors[self.monitor_group_name]
+            
             await self.channel_layer.group_discard(
                 self.monitor_group_name,
                 self.channel_name
             )
 
-    @database_sync_to_async
-    def verify_monitor_permission(self):
+    async def verify_monitor_permission(self):
         """Check if user can monitor this alert (is emergency contact or alert owner)"""
         try:
-            alert = Alert.objects.get(alert_id=self.alert_id)
-            
-            # Owner can always monitor
-            if alert.user == self.user:
-                return True
-            
-            # Check if user is an emergency contact
-            is_contact = alert.user.emergency_contacts.filter(
+            # Owner can always monitor; otherwise the user must be one of the
+            # owner's emergency contacts. Both are checked in one query.
+            is_contact = EmergencyContact.objects.filter(
+                user=OuterRef('user'),
                 email=self.user.email
-            ).exists()
+            )
             
-            return is_contact
+            return await Alert.objects.filter(
+                Q(user=self.user) | Exists(is_contact),
+                alert_id=self.alert_id
+            ).aexists()
         except:
             return False
 
-    @database_sync_to_async
-    def get_alert_data(self):
+    async def get_alert_data(self):
+        cache_key = _alert_data_key(self.alert_id)
+        try:
+            cached = await cache.aget(cache_key)
+            if cached is not None:
+                return _msgpack_decoder.decode(cached)
+        except Exception as e:
+            print(f"Error reading alert data cache: {e}")
+        
+        alert_data = await self.fetch_alert_data()
+        if alert_data is not None:
+            try:
+                await cache.aset(cache_key, _msgpack_encoder.encode(alert_data), ALERT_DATA_CACHE_TTL)
+            except Exception as e:
+                print(f"Error writing alert data cache: {e}")
+        return alert_data
+
+    async def fetch_alert_data(self):
         try:
-            alert = Alert.objects.get(alert_id=self.alert_id)
-            latest_location = alert.location_tracks.first()
+            alert = await Alert.objects.select_related('latest_track', 'user').aget(alert_id=self.alert_id)
+            latest_location = alert.latest_track
             
             return {
-                'alert_id': str(alert.alert_id),
+                'alert_id': alert.alert_id,
                 'status': alert.status,
                 'triggered_at': alert.triggered_at.isoformat(),
                 'user': alert.user.get_full_name() or alert.user.username,
                 'latest_location': {
-                    'latitude': float(latest_location.latitude),
-                    'longitude': float(latest_location.longitude),
+                    'latitude': latest_location.latitude,
+                    'longitude': latest_location.longitude,
                     'timestamp': latest_location.timestamp.isoformat()
                 } if latest_location else None
             }
@@ -378,4 +626,6 @@ class MonitorConsumer(AsyncWebsocketConsumer):
 
     async def location_broadcast(self, event):
         """Receive location broadcast from alert consumer"""
-        await self.send(text_data=json.dumps(event))
\ No newline at end of file
+        if event.get('origin') == _PROCESS_ID:
+            return
+        await self.send_message(LocationUpdateMsg(location=event['location']))
\ No newline at end of file
@@ -2,6 +2,7 @@
 from django import forms
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
+from django.core.validators import MaxValueValidator, MinValueValidator
 from .models import UserProfile, EmergencyContact, SafeZone
 
 
@@ -45,18 +46,22 @@ class UserProfileForm(forms.ModelForm):
     first_name = forms.CharField(max_length=30, required=True, widget=forms.TextInput(attrs={'class': 'form-control'}))
     last_name = forms.CharField(max_length=30, required=True, widget=forms.TextInput(attrs={'class': 'form-control'}))
     email = forms.EmailField(required=True, widget=forms.EmailInput(attrs={'class': 'form-control'}))
+    safe_word = forms.CharField(
+        max_length=50,
+        required=False,
+        help_text='Secret word to cancel alerts; leave blank to keep the current one',
+        widget=forms.PasswordInput(attrs={'class': 'form-control'})
+    )
     
     class Meta:
         model = UserProfile
-        fields = ['phone_number', 'emergency_keyword', 'safe_word']
+        fields = ['phone_number', 'emergency_keyword']
         widgets = {
             'phone_number': forms.TextInput(attrs={'class': 'form-control'}),
             'emergency_keyword': forms.TextInput(attrs={'class': 'form-control'}),
-            'safe_word': forms.PasswordInput(attrs={'class': 'form-control'}, render_value=True),
         }
         help_texts = {
             'emergency_keyword': 'A keyword to trigger alert via text',
-            'safe_word': 'Secret word to cancel alerts',
         }
     
     def __init__(self, *args, **kwargs):
@@ -75,6 +80,9 @@ class UserProfileForm(forms.ModelForm):
         user.last_name = self.cleaned_data['last_name']
         user.email = self.cleaned_data['email']
         
+        if self.cleaned_data.get('safe_word'):
+            profile.set_safe_word(self.cleaned_data['safe_word'])
+        
         if commit:
             user.save()
             profile.save()
@@ -119,6 +127,15 @@ class EmergencyContactForm(forms.ModelForm):
 
 
 class SafeZoneForm(forms.ModelForm):
+    LATITUDE_VALIDATORS = [
+        MinValueValidator(-90, message='Latitude must be between -90 and 90'),
+        MaxValueValidator(90, message='Latitude must be between -90 and 90'),
+    ]
+    LONGITUDE_VALIDATORS = [
+        MinValueValidator(-180, message='Longitude must be between -180 and 180'),
+        MaxValueValidator(180, message='Longitude must be between -180 and 180'),
+    ]
+    
     class Meta:
         model = SafeZone
         fields = ['name', 'latitude', 'longitude', 'radius_meters', 'is_active']
@@ -153,15 +170,7 @@ class SafeZoneForm(forms.ModelForm):
             'radius_meters': 'Safe zone radius in meters (50-5000)',
         }
     
-    def clean(self):
-        cleaned_data = super().clean()
-        lat = cleaned_data.get('latitude')
-        lon = cleaned_data.get('longitude')
-        
-        if lat and (lat < -90 or lat > 90):
-            raise forms.ValidationError('Latitude must be between -90 and 90')
-        
-        if lon and (lon < -180 or lon > 180):
-            raise forms.ValidationError('Longitude must be between -180 and 180')
-        
-        return cleaned_data
\ No newline at end of file
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['latitude'].validators.extend(self.LATITUDE_VALIDATORS)
+        self.fields['longitude'].validators.extend(self.LONGITUDE_VALIDATORS)
\ No newline at end of file
@@ -0,0 +1,39 @@
+# safety_app/middleware.py
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from .audit import AuditBuffer
+
+
+class AuditFlushMiddleware:
+    """Writes the audit log entries a request queued with a single bulk insert"""
+    
+    sync_capable = True
+    async_capable = True
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+    
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = AuditBuffer.start()
+        try:
+            return self.get_response(request)
+        finally:
+            try:
+                AuditBuffer.flush(token)
+            except Exception as e:
+                print(f"Error flushing audit log: {e}")
+    
+    async def __acall__(self, request):
+        # The buffer is reset on the event loop (where it was set); only the
+        # insert runs in a worker thread
+        token = AuditBuffer.start()
+        try:
+            return await self.get_response(request)
+        finally:
+            try:
+                await sync_to_async(AuditBuffer.write)(AuditBuffer.stop(token))
+            except Exception as e:
+                print(f"Error flushing audit log: {e}")
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-15 02:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('safety_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='safezone',
+            index=models.Index(fields=['user', 'is_active'], name='safezone_user_active_idx'),
+        ),
+    ]
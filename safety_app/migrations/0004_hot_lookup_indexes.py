@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-15 02:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('safety_app', '0003_buffered_timestamps'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='alert',
+            index=models.Index(fields=['user', 'status'], name='alert_user_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='emergencycontact',
+            index=models.Index(fields=['user', 'email'], name='contact_user_email_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='locationtrack',
+            index=models.Index(fields=['alert', '-timestamp'], name='track_alert_timestamp_idx'),
+        ),
+    ]
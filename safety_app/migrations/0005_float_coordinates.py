@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-15 02:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('safety_app', '0004_hot_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='alert',
+            name='initial_latitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='alert',
+            name='initial_longitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='locationtrack',
+            name='latitude',
+            field=models.FloatField(),
+        ),
+        migrations.AlterField(
+            model_name='locationtrack',
+            name='longitude',
+            field=models.FloatField(),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.7 on 2026-10-15 02:56
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_latest_track(apps, schema_editor):
+    Alert = apps.get_model('safety_app', 'Alert')
+    LocationTrack = apps.get_model('safety_app', 'LocationTrack')
+    latest = LocationTrack.objects.filter(alert=models.OuterRef('pk')).order_by('-timestamp').values('pk')[:1]
+    Alert.objects.update(latest_track=models.Subquery(latest))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('safety_app', '0005_float_coordinates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='alert',
+            name='latest_track',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='safety_app.locationtrack'),
+        ),
+        migrations.RunPython(backfill_latest_track, migrations.RunPython.noop),
+    ]
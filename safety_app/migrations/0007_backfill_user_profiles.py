@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.db import migrations
+
+
+def create_missing_profiles(apps, schema_editor):
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    UserProfile = apps.get_model('safety_app', 'UserProfile')
+    UserProfile.objects.bulk_create([
+        UserProfile(user_id=user_id, phone_number='')
+        for user_id in User.objects.filter(profile__isnull=True).values_list('id', flat=True)
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('safety_app', '0006_alert_latest_track'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_missing_profiles, migrations.RunPython.noop),
+    ]
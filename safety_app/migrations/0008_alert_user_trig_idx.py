@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-15 03:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('safety_app', '0007_backfill_user_profiles'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='alert',
+            index=models.Index(fields=['user', '-triggered_at'], name='alert_user_trig_idx'),
+        ),
+    ]
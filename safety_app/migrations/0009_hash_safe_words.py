@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-15 03:06
+
+import hashlib
+
+from django.db import migrations, models
+
+
+def hash_existing_safe_words(apps, schema_editor):
+    UserProfile = apps.get_model('safety_app', 'UserProfile')
+    profiles = list(UserProfile.objects.exclude(safe_word__isnull=True).exclude(safe_word=''))
+    for profile in profiles:
+        profile.safe_word_hash = hashlib.sha256(profile.safe_word.strip().lower().encode('utf-8')).digest()
+    UserProfile.objects.bulk_update(profiles, ['safe_word_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('safety_app', '0008_alert_user_trig_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='safe_word_hash',
+            field=models.BinaryField(blank=True, default=b'', editable=False, max_length=32),
+        ),
+        migrations.RunPython(hash_existing_safe_words, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='userprofile',
+            name='safe_word',
+        ),
+    ]
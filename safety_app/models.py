@@ -3,16 +3,28 @@ from django.db import models
 from django.contrib.auth.models import User
 from django.core.validators import RegexValidator
 from django.utils import timezone
+import hashlib
+import hmac
 import uuid
 
+# Shared by UserProfile and EmergencyContact; the pattern is compiled once on first use
+_PHONE_VALIDATOR = RegexValidator(regex=r'^\+?1?\d{9,15}$', message="Enter valid phone number")
+
+
+def hash_safe_word(safe_word):
+    """SHA-256 digest of a safe word, normalised the way it is compared"""
+    return hashlib.sha256(safe_word.strip().lower().encode('utf-8')).digest()
+
+
 class UserProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile')
     phone_number = models.CharField(
         max_length=15,
-        validators=[RegexValidator(regex=r'^\+?1?\d{9,15}$', message="Enter valid phone number")]
+        validators=[_PHONE_VALIDATOR]
     )
     emergency_keyword = models.CharField(max_length=50, blank=True, null=True)
-    safe_word = models.CharField(max_length=50, blank=True, null=True)
+    # Only the digest of the safe word is stored; see set_safe_word()
+    safe_word_hash = models.BinaryField(max_length=32, blank=True, default=b'', editable=False)
     is_active_alert = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -20,6 +32,19 @@ class UserProfile(models.Model):
     def __str__(self):
         return f"{self.user.username} - Profile"
 
+    @property
+    def has_safe_word(self):
+        return bool(self.safe_word_hash)
+
+    def set_safe_word(self, safe_word):
+        self.safe_word_hash = hash_safe_word(safe_word) if safe_word else b''
+
+    def check_safe_word(self, safe_word):
+        """Compare an attempted safe word against the stored digest in constant time"""
+        if not self.safe_word_hash or not safe_word:
+            return False
+        return hmac.compare_digest(bytes(self.safe_word_hash), hash_safe_word(safe_word))
+
     class Meta:
         verbose_name = "User Profile"
         verbose_name_plural = "User Profiles"
@@ -31,7 +56,7 @@ class EmergencyContact(models.Model):
     relationship = models.CharField(max_length=50)
     phone_number = models.CharField(
         max_length=15,
-        validators=[RegexValidator(regex=r'^\+?1?\d{9,15}$', message="Enter valid phone number")]
+        validators=[_PHONE_VALIDATOR]
     )
     email = models.EmailField()
     priority = models.IntegerField(default=1, help_text="1 is highest priority")
@@ -46,6 +71,9 @@ class EmergencyContact(models.Model):
         verbose_name = "Emergency Contact"
         verbose_name_plural = "Emergency Contacts"
         ordering = ['priority', 'name']
+        indexes = [
+            models.Index(fields=['user', 'email'], name='contact_user_email_idx'),
+        ]
 
 
 class SafeZone(models.Model):
@@ -64,6 +92,9 @@ class SafeZone(models.Model):
     class Meta:
         verbose_name = "Safe Zone"
         verbose_name_plural = "Safe Zones"
+        indexes = [
+            models.Index(fields=['user', 'is_active'], name='safezone_user_active_idx'),
+        ]
 
 
 class Alert(models.Model):
@@ -85,8 +116,8 @@ class Alert(models.Model):
     trigger_method = models.CharField(max_length=50, default='panic_button')
     
     # Location Information
-    initial_latitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
-    initial_longitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
+    initial_latitude = models.FloatField(null=True, blank=True)
+    initial_longitude = models.FloatField(null=True, blank=True)
     initial_accuracy = models.FloatField(null=True, blank=True)
     
     # Cancellation Information
@@ -106,6 +137,15 @@ class Alert(models.Model):
     safe_word_attempted = models.BooleanField(default=False)
     safe_word_success = models.BooleanField(default=False)
     
+    # Most recent location, maintained when tracks are flushed
+    latest_track = models.ForeignKey(
+        'LocationTrack',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    
     # Metadata
     user_agent = models.TextField(blank=True, null=True)
     ip_address = models.GenericIPAddressField(null=True, blank=True)
@@ -120,17 +160,22 @@ class Alert(models.Model):
         verbose_name = "Alert"
         verbose_name_plural = "Alerts"
         ordering = ['-triggered_at']
+        indexes = [
+            models.Index(fields=['user', 'status'], name='alert_user_status_idx'),
+            models.Index(fields=['user', '-triggered_at'], name='alert_user_trig_idx'),
+        ]
 
 
 class LocationTrack(models.Model):
     alert = models.ForeignKey(Alert, on_delete=models.CASCADE, related_name='location_tracks')
-    latitude = models.DecimalField(max_digits=9, decimal_places=6)
-    longitude = models.DecimalField(max_digits=9, decimal_places=6)
+    latitude = models.FloatField()
+    longitude = models.FloatField()
     accuracy = models.FloatField(null=True, blank=True)
     altitude = models.FloatField(null=True, blank=True)
     speed = models.FloatField(null=True, blank=True)
     heading = models.FloatField(null=True, blank=True)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Set when the point is received; rows may be written later in a batch
+    timestamp = models.DateTimeField(default=timezone.now, editable=False)
     is_in_safe_zone = models.BooleanField(default=False)
     nearest_safe_zone = models.ForeignKey(SafeZone, on_delete=models.SET_NULL, null=True, blank=True)
 
@@ -141,6 +186,9 @@ class LocationTrack(models.Model):
         verbose_name = "Location Track"
         verbose_name_plural = "Location Tracks"
         ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['alert', '-timestamp'], name='track_alert_timestamp_idx'),
+        ]
 
 
 class DispatchLog(models.Model):
@@ -196,7 +244,7 @@ class AuditLog(models.Model):
     description = models.TextField()
     ip_address = models.GenericIPAddressField(null=True, blank=True)
     user_agent = models.TextField(blank=True, null=True)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    timestamp = models.DateTimeField(default=timezone.now, editable=False)
     metadata = models.JSONField(default=dict, blank=True)
 
     def __str__(self):
@@ -1,9 +1,107 @@
 # safety_app/services.py
+from asgiref.sync import sync_to_async
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from django.core.cache import cache
+from django.db import transaction
 from django.utils import timezone
 from django.conf import settings
-from .models import Alert, AuditLog, DispatchLog, EmergencyContact
-from decimal import Decimal
+from .models import Alert, AuditLog, DispatchLog, EmergencyContact, UserProfile
 from datetime import timedelta
+from math import asin, cos, radians, sin, sqrt
+import numpy as np
+
+# Alert statuses that block a new alert from being triggered
+ACTIVE_ALERT_STATUSES = ['TRIGGERED', 'PENDING_CANCEL', 'DISPATCHED']
+
+# Each user's active alert id ('' for none) is cached under this key and kept
+# in step by every path that opens or closes an alert. A cached id is always
+# re-checked against the database before it is trusted, because alerts can be
+# closed elsewhere (the admin, another process's LocMemCache).
+ACTIVE_ALERT_CACHE_TTL = 3600
+
+
+def active_alert_key(user_id):
+    return f'active_alert:{user_id}'
+
+
+# Each user's active emergency contacts, cleared by the EmergencyContact
+# save/delete signals. Invalidation only reaches other processes with a shared
+# cache backend, so this is for display paths; dispatch reads the database.
+ACTIVE_CONTACTS_CACHE_TTL = 300
+
+
+def active_contacts_key(user_id):
+    return f'contacts:{user_id}'
+
+
+def get_active_contacts(user_id):
+    """Return the user's active emergency contacts in priority order, cached"""
+    key = active_contacts_key(user_id)
+    contacts = cache.get(key)
+    if contacts is None:
+        contacts = list(EmergencyContact.objects.filter(user_id=user_id, is_active=True))
+        cache.set(key, contacts, ACTIVE_CONTACTS_CACHE_TTL)
+    return contacts
+
+
+# Dispatch message templates, filled from DispatchService._message_fields
+SMS_TEMPLATE = """🚨 EMERGENCY ALERT 🚨
+
+{full_name} has triggered an emergency alert!
+
+Time: {triggered}
+Location: {location_url}
+
+Monitor live tracking: {monitor_url}
+
+This is an automated message from Women Safety Web Alert System."""
+
+# Sent after a per-contact "Dear <name>," greeting
+EMAIL_BODY_TEMPLATE = """This is an EMERGENCY ALERT from the Women Safety Web Alert System.
+
+{full_name} has triggered an emergency alert and you are listed as an emergency contact.
+
+ALERT DETAILS:
+- User: {full_name}
+- Trigger Time: {triggered}
+- Trigger Method: {trigger_method}
+- Alert ID: {alert_id}
+
+LOCATION INFORMATION:
+Current Location: {location_url}
+
+REAL-TIME TRACKING:
+You can monitor the user's real-time location here:
+{monitor_url}
+
+WHAT TO DO:
+1. Try to contact {first_name} immediately
+2. If you cannot reach them, consider contacting local authorities
+3. Use the tracking link above to monitor their location
+
+This is an automated alert. Please respond immediately.
+
+---
+Women Safety Web Alert System
+Emergency Response Protocol"""
+
+# Upper bound on concurrent gateway calls made by one dispatch task
+DISPATCH_MAX_WORKERS = 32
+
+# Mean Earth radius used by the Haversine helpers
+EARTH_RADIUS_METERS = 6371000
+
+
+def _haversine(lat1, lon1, lat2, lon2):
+    """Scalar Haversine kernel on plain floats in decimal degrees"""
+    lat1 = radians(lat1)
+    lat2 = radians(lat2)
+    a = sin((lat2 - lat1) / 2) ** 2 + cos(lat1) * cos(lat2) * sin(radians(lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_METERS * asin(sqrt(a))
+
+
+class GatewayError(Exception):
+    """Raised when an SMS or email gateway fails to deliver a message"""
 
 
 class AlertService:
@@ -11,63 +109,94 @@ class AlertService:
     
     def create_alert(self, user, latitude, longitude, trigger_method, user_agent=None, ip_address=None):
         """Create a new alert"""
-        alert = Alert.objects.create(
-            user=user,
-            status='TRIGGERED',
-            trigger_method=trigger_method,
-            initial_latitude=Decimal(str(latitude)) if latitude else None,
-            initial_longitude=Decimal(str(longitude)) if longitude else None,
-            user_agent=user_agent,
-            ip_address=ip_address,
-            cancellation_timer_started=timezone.now()
-        )
-        
-        # Update user profile
-        profile = user.profile
-        profile.is_active_alert = True
-        profile.save()
+        with transaction.atomic():
+            alert = Alert.objects.create(
+                user=user,
+                status='TRIGGERED',
+                trigger_method=trigger_method,
+                initial_latitude=float(latitude) if latitude is not None else None,
+                initial_longitude=float(longitude) if longitude is not None else None,
+                user_agent=user_agent,
+                ip_address=ip_address,
+                cancellation_timer_started=timezone.now()
+            )
+            
+            # Update user profile
+            UserProfile.objects.filter(user_id=user.id).update(
+                is_active_alert=True,
+                updated_at=timezone.now()
+            )
+            
+            # Create audit log
+            AuditLog.objects.create(
+                user=user,
+                alert=alert,
+                action='ALERT_TRIGGERED',
+                description=f'Alert triggered via {trigger_method}',
+                ip_address=ip_address,
+                user_agent=user_agent,
+                metadata={
+                    'latitude': str(latitude) if latitude else None,
+                    'longitude': str(longitude) if longitude else None,
+                    'trigger_method': trigger_method
+                }
+            )
         
-        # Create audit log
-        AuditLog.objects.create(
+        cache.set(active_alert_key(user.id), str(alert.alert_id), ACTIVE_ALERT_CACHE_TTL)
+        return alert
+    
+    def get_active_alert(self, user):
+        """Return the user's active alert (or None); a warm cache makes this a primary-key fetch"""
+        key = active_alert_key(user.id)
+        alert_id = cache.get(key)
+        if alert_id == '':
+            return None
+        if alert_id:
+            alert = Alert.objects.filter(
+                alert_id=alert_id,
+                status__in=ACTIVE_ALERT_STATUSES
+            ).first()
+            if alert is not None:
+                return alert
+            # Closed or deleted without going through AlertService
+        alert = Alert.objects.filter(
             user=user,
-            alert=alert,
-            action='ALERT_TRIGGERED',
-            description=f'Alert triggered via {trigger_method}',
-            ip_address=ip_address,
-            user_agent=user_agent,
-            metadata={
-                'latitude': str(latitude) if latitude else None,
-                'longitude': str(longitude) if longitude else None,
-                'trigger_method': trigger_method
-            }
-        )
-        
+            status__in=ACTIVE_ALERT_STATUSES
+        ).first()
+        cache.set(key, str(alert.alert_id) if alert else '', ACTIVE_ALERT_CACHE_TTL)
         return alert
     
+    async def aget_active_alert(self, user):
+        return await sync_to_async(self.get_active_alert)(user)
+    
     def cancel_alert(self, alert, reason=''):
         """Cancel an active alert"""
-        if alert.status not in ['TRIGGERED', 'PENDING_CANCEL', 'DISPATCHED']:
+        if alert.status not in ACTIVE_ALERT_STATUSES:
             return False
         
         alert.status = 'CANCELLED'
         alert.cancelled_at = timezone.now()
         alert.cancellation_reason = reason
-        alert.save()
-        
-        # Update user profile
-        profile = alert.user.profile
-        profile.is_active_alert = False
-        profile.save()
         
-        # Create audit log
-        AuditLog.objects.create(
-            user=alert.user,
-            alert=alert,
-            action='ALERT_CANCELLED',
-            description=f'Alert cancelled: {reason}',
-            metadata={'cancellation_reason': reason}
-        )
+        with transaction.atomic():
+            alert.save(update_fields=['status', 'cancelled_at', 'cancellation_reason', 'updated_at'])
+            
+            # Update user profile
+            UserProfile.objects.filter(user_id=alert.user_id).update(
+                is_active_alert=False,
+                updated_at=timezone.now()
+            )
+            
+            # Create audit log
+            AuditLog.objects.create(
+                user_id=alert.user_id,
+                alert=alert,
+                action='ALERT_CANCELLED',
+                description=f'Alert cancelled: {reason}',
+                metadata={'cancellation_reason': reason}
+            )
         
+        cache.delete(active_alert_key(alert.user_id))
         return True
     
     def resolve_alert(self, alert, notes=''):
@@ -75,22 +204,26 @@ class AlertService:
         alert.status = 'RESOLVED'
         alert.resolved_at = timezone.now()
         alert.resolution_notes = notes
-        alert.save()
         
-        # Update user profile
-        profile = alert.user.profile
-        profile.is_active_alert = False
-        profile.save()
-        
-        # Create audit log
-        AuditLog.objects.create(
-            user=alert.user,
-            alert=alert,
-            action='ALERT_RESOLVED',
-            description=f'Alert resolved: {notes}',
-            metadata={'resolution_notes': notes}
-        )
+        with transaction.atomic():
+            alert.save(update_fields=['status', 'resolved_at', 'resolution_notes', 'updated_at'])
+            
+            # Update user profile
+            UserProfile.objects.filter(user_id=alert.user_id).update(
+                is_active_alert=False,
+                updated_at=timezone.now()
+            )
+            
+            # Create audit log
+            AuditLog.objects.create(
+                user_id=alert.user_id,
+                alert=alert,
+                action='ALERT_RESOLVED',
+                description=f'Alert resolved: {notes}',
+                metadata={'resolution_notes': notes}
+            )
         
+        cache.delete(active_alert_key(alert.user_id))
         return True
     
     def check_timeout(self, alert):
@@ -115,7 +248,7 @@ class AlertService:
         
         alert.safe_word_attempted = True
         
-        if profile.safe_word and profile.safe_word.lower() == safe_word.lower():
+        if profile.check_safe_word(safe_word):
             alert.safe_word_success = True
             alert.save()
             return True
@@ -129,9 +262,12 @@ class DispatchService:
     
     def dispatch_alert(self, alert):
         """Dispatch alert to all active emergency contacts"""
-        contacts = alert.user.emergency_contacts.filter(is_active=True).order_by('priority')
+        user = alert.user
+        # Read fresh: a stale list could miss a new contact or reference a
+        # deleted one
+        contacts = list(user.emergency_contacts.filter(is_active=True))
         
-        if not contacts.exists():
+        if not contacts:
             return {
                 'success': False,
                 'message': 'No active emergency contacts found',
@@ -142,14 +278,18 @@ class DispatchService:
         dispatch_logs = []
         contacts_notified = 0
         
+        # Only the email greeting differs between contacts
+        fields = self._message_fields(alert)
+        sms_message = SMS_TEMPLATE.format_map(fields)
+        email_body = EMAIL_BODY_TEMPLATE.format_map(fields)
+        
         for contact in contacts:
-            # Dispatch via SMS
-            sms_log = self._send_sms(alert, contact)
-            dispatch_logs.append(sms_log)
+            # Queue SMS
+            dispatch_logs.append(self._build_log(alert, contact, 'SMS', sms_message))
             
-            # Dispatch via Email
-            email_log = self._send_email(alert, contact)
-            dispatch_logs.append(email_log)
+            # Queue Email
+            email_message = f'Dear {contact.name},\n\n{email_body}'
+            dispatch_logs.append(self._build_log(alert, contact, 'EMAIL', email_message))
             
             contacts_notified += 1
         
@@ -157,19 +297,26 @@ class DispatchService:
         alert.status = 'DISPATCHED'
         alert.dispatched_at = timezone.now()
         alert.contacts_notified = contacts_notified
-        alert.save()
         
-        # Create audit log
-        AuditLog.objects.create(
-            user=alert.user,
-            alert=alert,
-            action='ALERT_DISPATCHED',
-            description=f'Alert dispatched to {contacts_notified} contacts',
-            metadata={
-                'contacts_notified': contacts_notified,
-                'dispatch_channels': ['SMS', 'EMAIL']
-            }
-        )
+        with transaction.atomic():
+            # All dispatch logs go in with one INSERT
+            DispatchLog.objects.bulk_create(dispatch_logs, batch_size=500)
+            alert.save()
+            
+            # Create audit log
+            AuditLog.objects.create(
+                user=user,
+                alert=alert,
+                action='ALERT_DISPATCHED',
+                description=f'Alert dispatched to {contacts_notified} contacts',
+                metadata={
+                    'contacts_notified': contacts_notified,
+                    'dispatch_channels': ['SMS', 'EMAIL']
+                }
+            )
+            
+            # Workers only see the logs once they are committed
+            transaction.on_commit(lambda: self._enqueue(alert.alert_id))
         
         return {
             'success': True,
@@ -183,99 +330,101 @@ class DispatchService:
             ]
         }
     
-    def _send_sms(self, alert, contact):
-        """Simulate SMS dispatch"""
-        message = self._generate_sms_message(alert, contact)
-        
-        # Create dispatch log (simulated)
-        log = DispatchLog.objects.create(
-            alert=alert,
-            contact=contact,
-            channel='SMS',
-            status='SIMULATED',
-            message_content=message,
-            sent_at=timezone.now()
+    def deliver(self, alert_id, channel):
+        """Send an alert's pending dispatch logs on one channel concurrently (runs on a Celery worker)"""
+        logs = list(
+            DispatchLog.objects.select_related('contact').filter(
+                alert_id=alert_id,
+                channel=channel,
+                status='PENDING'
+            )
         )
-        
-        return log
+        if not logs:
+            return 0
+        
+        # Gateway calls overlap on the pool; the ORM is only used on this thread
+        failed = 0
+        with ThreadPoolExecutor(max_workers=min(DISPATCH_MAX_WORKERS, len(logs))) as pool:
+            futures = {pool.submit(self._send, log): log for log in logs}
+            for future in as_completed(futures):
+                log = futures[future]
+                try:
+                    future.result()
+                except GatewayError as e:
+                    log.error_message = str(e)
+                    failed += 1
+                else:
+                    log.status = 'SIMULATED'
+                    log.sent_at = timezone.now()
+                    log.error_message = None
+        
+        DispatchLog.objects.bulk_update(logs, ['status', 'sent_at', 'error_message'], batch_size=100)
+        
+        # Failed logs stay PENDING, so a retry only resends those
+        if failed:
+            raise GatewayError(f'{failed} of {len(logs)} messages failed')
+        return len(logs)
     
-    def _send_email(self, alert, contact):
-        """Simulate email dispatch"""
-        message = self._generate_email_message(alert, contact)
-        
-        # Create dispatch log (simulated)
-        log = DispatchLog.objects.create(
+    def _enqueue(self, alert_id):
+        """Hand an alert's pending dispatch logs to the per-channel Celery queues"""
+        from celery import group
+        from .tasks import send_email_task, send_sms_task
+        
+        # Tasks select the logs by alert and channel, so this works on
+        # backends where bulk_create doesn't set primary keys
+        alert_id = str(alert_id)
+        try:
+            group([send_sms_task.s(alert_id), send_email_task.s(alert_id)]).apply_async()
+        except Exception as e:
+            # Broker unreachable: send now rather than leave the alert
+            # DISPATCHED with nothing on its way
+            print(f"Error queueing dispatch, delivering inline: {e}")
+            for channel in ('SMS', 'EMAIL'):
+                try:
+                    self.deliver(alert_id, channel)
+                except Exception as e:
+                    print(f"Error delivering {channel} dispatch: {e}")
+    
+    def _build_log(self, alert, contact, channel, message):
+        """Build an unsaved pending dispatch log"""
+        return DispatchLog(
             alert=alert,
             contact=contact,
-            channel='EMAIL',
-            status='SIMULATED',
-            message_content=message,
-            sent_at=timezone.now()
+            channel=channel,
+            status='PENDING',
+            message_content=message
         )
-        
-        return log
     
-    def _generate_sms_message(self, alert, contact):
-        """Generate SMS message content"""
-        user = alert.user
-        location_url = self._generate_maps_url(
-            alert.initial_latitude, 
-            alert.initial_longitude
-        )
-        
-        message = f"""🚨 EMERGENCY ALERT 🚨
-
-{user.get_full_name() or user.username} has triggered an emergency alert!
-
-Time: {alert.triggered_at.strftime('%Y-%m-%d %H:%M:%S')}
-Location: {location_url}
-
-Monitor live tracking: {self._generate_monitor_url(alert)}
-
-This is an automated message from Women Safety Web Alert System."""
-        
-        return message
+    def _send(self, log):
+        if log.channel == 'SMS':
+            self._send_sms(log)
+        else:
+            self._send_email(log)
+    
+    def _send_sms(self, log):
+        """Simulate SMS dispatch"""
+        # In production this would call the SMS gateway with
+        # log.contact.phone_number and raise GatewayError on failure
+        pass
     
-    def _generate_email_message(self, alert, contact):
-        """Generate email message content"""
+    def _send_email(self, log):
+        """Simulate email dispatch"""
+        # In production this would call the email gateway with
+        # log.contact.email and raise GatewayError on failure
+        pass
+    
+    def _message_fields(self, alert):
+        """Values substituted into the message templates, computed once per dispatch"""
         user = alert.user
-        location_url = self._generate_maps_url(
-            alert.initial_latitude, 
-            alert.initial_longitude
-        )
-        monitor_url = self._generate_monitor_url(alert)
-        
-        message = f"""Dear {contact.name},
-
-This is an EMERGENCY ALERT from the Women Safety Web Alert System.
-
-{user.get_full_name() or user.username} has triggered an emergency alert and you are listed as an emergency contact.
-
-ALERT DETAILS:
-- User: {user.get_full_name() or user.username}
-- Trigger Time: {alert.triggered_at.strftime('%Y-%m-%d %H:%M:%S')}
-- Trigger Method: {alert.trigger_method}
-- Alert ID: {alert.alert_id}
-
-LOCATION INFORMATION:
-Current Location: {location_url}
-
-REAL-TIME TRACKING:
-You can monitor the user's real-time location here:
-{monitor_url}
-
-WHAT TO DO:
-1. Try to contact {user.first_name} immediately
-2. If you cannot reach them, consider contacting local authorities
-3. Use the tracking link above to monitor their location
-
-This is an automated alert. Please respond immediately.
-
----
-Women Safety Web Alert System
-Emergency Response Protocol"""
-        
-        return message
+        return {
+            'full_name': user.get_full_name() or user.username,
+            'first_name': user.first_name,
+            'triggered': alert.triggered_at.strftime('%Y-%m-%d %H:%M:%S'),
+            'trigger_method': alert.trigger_method,
+            'alert_id': alert.alert_id,
+            'location_url': self._generate_maps_url(alert.initial_latitude, alert.initial_longitude),
+            'monitor_url': self._generate_monitor_url(alert),
+        }
     
     def _generate_maps_url(self, latitude, longitude):
         """Generate Google Maps URL for location"""
@@ -299,51 +448,50 @@ class GeoSpatialService:
         on the earth (specified in decimal degrees)
         Returns distance in meters
         """
-        from math import radians, sin, cos, sqrt, atan2
-        
-        # Convert to radians
-        lat1, lon1, lat2, lon2 = map(radians, [
-            float(lat1), float(lon1), 
-            float(lat2), float(lon2)
-        ])
-        
-        # Haversine formula
-        dlat = lat2 - lat1
-        dlon = lon2 - lon1
-        a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-        c = 2 * atan2(sqrt(a), sqrt(1-a))
+        return _haversine(float(lat1), float(lon1), float(lat2), float(lon2))
+    
+    @staticmethod
+    def haversine_distances(latitude, longitude, lats_rad, lons_rad):
+        """
+        Vectorised Haversine distance from one point (decimal degrees)
+        to many points given as float64 arrays in radians
+        Returns an array of distances in meters
+        """
+        lat1 = np.radians(float(latitude))
+        lon1 = np.radians(float(longitude))
         
-        # Earth's radius in meters
-        R = 6371000
-        distance = R * c
+        a = (
+            np.sin((lats_rad - lat1) / 2) ** 2
+            + np.cos(lat1) * np.cos(lats_rad) * np.sin((lons_rad - lon1) / 2) ** 2
+        )
         
-        return distance
+        return 2 * EARTH_RADIUS_METERS * np.arcsin(np.sqrt(a))
     
     @staticmethod
     def is_in_safe_zone(user, latitude, longitude):
         """
         Check if coordinates are within any of user's safe zones
-        Returns (is_safe, nearest_zone, distance)
+        Returns (is_safe, nearest_zone_id, distance)
         """
-        safe_zones = user.safe_zones.filter(is_active=True)
-        
-        nearest_zone = None
-        min_distance = float('inf')
-        
-        for zone in safe_zones:
-            distance = GeoSpatialService.haversine_distance(
-                latitude, longitude,
-                zone.latitude, zone.longitude
-            )
-            
-            if distance < min_distance:
-                min_distance = distance
-                nearest_zone = zone
-            
-            if distance <= zone.radius_meters:
-                return True, zone, distance
+        rows = np.asarray(
+            list(user.safe_zones.filter(is_active=True).values_list(
+                'id', 'latitude', 'longitude', 'radius_meters'
+            )),
+            dtype=np.float64
+        ).reshape(-1, 4)
+        
+        if not len(rows):
+            return False, None, float('inf')
+        
+        distances = GeoSpatialService.haversine_distances(
+            latitude, longitude,
+            np.radians(rows[:, 1]), np.radians(rows[:, 2])
+        )
+        inside = distances <= rows[:, 3]
         
-        return False, nearest_zone, min_distance
+        # First containing zone in queryset order, otherwise the nearest one
+        idx = int(np.argmax(inside)) if inside.any() else int(np.argmin(distances))
+        return bool(inside[idx]), int(rows[idx, 0]), float(distances[idx])
     
     @staticmethod
     def get_address_from_coordinates(latitude, longitude):
@@ -0,0 +1,23 @@
+# safety_app/signals.py
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .models import EmergencyContact, UserProfile
+from .services import active_contacts_key
+
+
+@receiver(post_save, sender=User)
+def create_profile(sender, instance, created, raw=False, **kwargs):
+    """Give every new user a profile so views can rely on user.profile"""
+    if created and not raw:
+        UserProfile.objects.get_or_create(user=instance, defaults={'phone_number': ''})
+
+
+@receiver(post_save, sender=EmergencyContact)
+@receiver(post_delete, sender=EmergencyContact)
+def clear_active_contacts(sender, instance, **kwargs):
+    """Drop the user's cached contact list once the change is committed"""
+    key = active_contacts_key(instance.user_id)
+    transaction.on_commit(lambda: cache.delete(key))
@@ -0,0 +1,15 @@
+# safety_app/tasks.py
+from celery import shared_task
+from .services import DispatchService, GatewayError
+
+
+@shared_task(bind=True, autoretry_for=(GatewayError,), retry_backoff=True, max_retries=5)
+def send_sms_task(self, alert_id):
+    """Deliver an alert's pending SMS dispatch logs"""
+    return DispatchService().deliver(alert_id, 'SMS')
+
+
+@shared_task(bind=True, autoretry_for=(GatewayError,), retry_backoff=True, max_retries=5)
+def send_email_task(self, alert_id):
+    """Deliver an alert's pending email dispatch logs"""
+    return DispatchService().deliver(alert_id, 'EMAIL')
@@ -1,3 +1,100 @@
+import json
+from unittest import mock
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from .models import Alert, DispatchLog, EmergencyContact
+from .services import active_alert_key
 
-# Create your tests here.
+
+class ActiveAlertCacheTests(TestCase):
+    """A cached active alert id must never block or misreport a new alert"""
+    
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('ann', 'ann@example.com', 'pw')
+        self.client.force_login(self.user)
+    
+    def trigger(self):
+        return self.client.post(
+            reverse('trigger_alert'),
+            json.dumps({'latitude': 12.97, 'longitude': 77.59}),
+            content_type='application/json'
+        )
+    
+    def test_trigger_ignores_cached_id_of_deleted_alert(self):
+        first = self.trigger()
+        self.assertEqual(first.status_code, 200)
+        
+        # Removed outside AlertService, so the cached id is left behind
+        Alert.objects.filter(alert_id=first.json()['alert_id']).delete()
+        
+        second = self.trigger()
+        self.assertEqual(second.status_code, 200)
+        self.assertNotEqual(second.json()['alert_id'], first.json()['alert_id'])
+    
+    def test_trigger_ignores_cached_id_of_resolved_alert(self):
+        first = self.trigger()
+        Alert.objects.filter(alert_id=first.json()['alert_id']).update(status='RESOLVED')
+        
+        second = self.trigger()
+        self.assertEqual(second.status_code, 200)
+    
+    def test_panel_does_not_show_closed_alert(self):
+        alert = Alert.objects.create(user=self.user, status='RESOLVED')
+        cache.set(active_alert_key(self.user.id), str(alert.alert_id))
+        
+        response = self.client.get(reverse('alert_panel'))
+        self.assertIsNone(response.context['active_alert'])
+        self.assertEqual(cache.get(active_alert_key(self.user.id)), '')
+    
+    def test_panel_loads_active_alert_in_one_query(self):
+        alert_id = self.trigger().json()['alert_id']
+        
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('alert_panel'))
+        
+        self.assertEqual(str(response.context['active_alert'].alert_id), alert_id)
+        alert_queries = [q for q in queries.captured_queries if 'FROM "safety_app_alert"' in q['sql']]
+        self.assertEqual(len(alert_queries), 1)
+
+
+class DispatchDeliveryTests(TestCase):
+    """Dispatched alerts must reach every contact once the transaction commits"""
+    
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('ann', 'ann@example.com', 'pw', first_name='Ann')
+        EmergencyContact.objects.create(
+            user=self.user, name='Bea', relationship='Sister',
+            phone_number='+1234567890', email='bea@example.com'
+        )
+        self.client.force_login(self.user)
+        self.alert = Alert.objects.create(user=self.user, status='TRIGGERED')
+    
+    def dispatch(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(
+                reverse('dispatch_alert'),
+                json.dumps({'alert_id': str(self.alert.alert_id)}),
+                content_type='application/json'
+            )
+    
+    def test_delivers_without_bulk_insert_primary_keys(self):
+        with mock.patch.object(type(connection.features), 'can_return_rows_from_bulk_insert', False):
+            response = self.dispatch()
+        
+        self.assertEqual(response.status_code, 200)
+        statuses = DispatchLog.objects.filter(alert=self.alert).values_list('status', flat=True)
+        self.assertEqual(sorted(statuses), ['SIMULATED', 'SIMULATED'])
+    
+    def test_delivers_inline_when_broker_is_down(self):
+        with mock.patch('celery.group.apply_async', side_effect=ConnectionError('broker down')):
+            response = self.dispatch()
+        
+        self.assertEqual(response.status_code, 200)
+        statuses = DispatchLog.objects.filter(alert=self.alert).values_list('status', flat=True)
+        self.assertEqual(sorted(statuses), ['SIMULATED', 'SIMULATED'])
@@ -2,20 +2,83 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import login, authenticate, logout
 from django.contrib.auth.decorators import login_required
+from django.contrib.auth.views import redirect_to_login
 from django.contrib import messages
-from django.http import JsonResponse
-from django.views.decorators.http import require_http_methods
+from django.core.paginator import Paginator
+from django.db.models import Prefetch
+from django.http import Http404, HttpResponse, HttpResponseNotAllowed
 from django.utils import timezone
+from django.views.decorators.cache import cache_control
 from .models import (
-    UserProfile, EmergencyContact, SafeZone, 
-    Alert, LocationTrack, DispatchLog, AuditLog
+    EmergencyContact, SafeZone, 
+    Alert, LocationTrack, DispatchLog
 )
 from .forms import (
     UserProfileForm, EmergencyContactForm, 
     SafeZoneForm, UserRegistrationForm
 )
-from .services import AlertService, DispatchService
-import json
+from .audit import AuditBuffer
+from .services import ACTIVE_ALERT_STATUSES, AlertService, DispatchService, get_active_contacts
+from asgiref.sync import sync_to_async
+from functools import wraps
+from typing import Optional
+import msgspec
+
+
+# Request bodies of the alert API endpoints; unknown keys are ignored
+class TriggerAlertBody(msgspec.Struct):
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    trigger_method: str = 'panic_button'
+
+
+class CancelAlertBody(msgspec.Struct):
+    alert_id: Optional[str] = None
+    reason: Optional[str] = 'User cancelled'
+
+
+class DispatchAlertBody(msgspec.Struct):
+    alert_id: Optional[str] = None
+
+
+_json_encoder = msgspec.json.Encoder()
+
+
+def parse_body(request, schema):
+    """Decode and validate a JSON request body into the given Struct"""
+    return msgspec.json.decode(request.body, type=schema)
+
+
+def json_response(payload, status=200):
+    return HttpResponse(_json_encoder.encode(payload), content_type='application/json', status=status)
+
+
+# Django 4.2's login_required and require_http_methods only wrap sync views
+def async_login_required(view_func):
+    """login_required for async views; the session user is loaded off the event loop"""
+    @wraps(view_func)
+    async def wrapper(request, *args, **kwargs):
+        is_authenticated = await sync_to_async(lambda: request.user.is_authenticated)()
+        if not is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        return await view_func(request, *args, **kwargs)
+    return wrapper
+
+
+def async_require_POST(view_func):
+    @wraps(view_func)
+    async def wrapper(request, *args, **kwargs):
+        if request.method != 'POST':
+            return HttpResponseNotAllowed(['POST'])
+        return await view_func(request, *args, **kwargs)
+    return wrapper
+
+
+async def aget_object_or_404(queryset, **kwargs):
+    try:
+        return await queryset.aget(**kwargs)
+    except queryset.model.DoesNotExist:
+        raise Http404(f'No {queryset.model._meta.object_name} matches the given query.')
 
 
 # Authentication Views
@@ -28,18 +91,17 @@ def register_view(request):
         if form.is_valid():
             user = form.save()
             
-            # Create user profile
-            UserProfile.objects.create(
-                user=user,
-                phone_number=form.cleaned_data.get('phone_number'),
-                safe_word=form.cleaned_data.get('safe_word')
-            )
+            # Fill in the profile created by the post_save signal
+            profile = user.profile
+            profile.phone_number = form.cleaned_data.get('phone_number')
+            profile.set_safe_word(form.cleaned_data.get('safe_word'))
+            profile.save()
             
             # Log user in
             login(request, user)
             
-            # Create audit log
-            AuditLog.objects.create(
+            # Queue audit log
+            AuditBuffer.add(
                 user=user,
                 action='USER_LOGIN',
                 description='User registered and logged in',
@@ -67,8 +129,8 @@ def login_view(request):
         if user is not None:
             login(request, user)
             
-            # Create audit log
-            AuditLog.objects.create(
+            # Queue audit log
+            AuditBuffer.add(
                 user=user,
                 action='USER_LOGIN',
                 description='User logged in',
@@ -86,8 +148,8 @@ def login_view(request):
 
 @login_required
 def logout_view(request):
-    # Create audit log
-    AuditLog.objects.create(
+    # Queue audit log
+    AuditBuffer.add(
         user=request.user,
         action='USER_LOGOUT',
         description='User logged out',
@@ -102,20 +164,25 @@ def logout_view(request):
 # Dashboard Views
 @login_required
 def dashboard_view(request):
-    # Get or create profile
-    profile, created = UserProfile.objects.get_or_create(
-        user=request.user,
-        defaults={'phone_number': ''}
+    profile = request.user.profile
+    
+    recent_alerts = list(
+        Alert.objects.filter(user=request.user)
+        .only('alert_id', 'status', 'triggered_at', 'trigger_method', 'contacts_notified')
+        .order_by('-triggered_at')[:5]
     )
     
-    active_alert = Alert.objects.filter(
-        user=request.user,
-        status__in=['TRIGGERED', 'PENDING_CANCEL', 'DISPATCHED']
-    ).first()
+    # An active alert is almost always the newest one, so look in the recent
+    # list first and only query when it could be older than all of them
+    active_alert = next((a for a in recent_alerts if a.status in ACTIVE_ALERT_STATUSES), None)
+    if active_alert is None and len(recent_alerts) == 5:
+        active_alert = Alert.objects.filter(
+            user=request.user,
+            status__in=ACTIVE_ALERT_STATUSES
+        ).first()
     
-    recent_alerts = Alert.objects.filter(user=request.user).order_by('-triggered_at')[:5]
-    emergency_contacts = request.user.emergency_contacts.filter(is_active=True)
-    safe_zones = request.user.safe_zones.filter(is_active=True)
+    emergency_contacts = get_active_contacts(request.user.id)
+    safe_zones = list(request.user.safe_zones.filter(is_active=True))
     
     context = {
         'profile': profile,
@@ -123,8 +190,8 @@ def dashboard_view(request):
         'recent_alerts': recent_alerts,
         'emergency_contacts': emergency_contacts,
         'safe_zones': safe_zones,
-        'contacts_count': emergency_contacts.count(),
-        'safe_zones_count': safe_zones.count(),
+        'contacts_count': len(emergency_contacts),
+        'safe_zones_count': len(safe_zones),
     }
     
     return render(request, 'safety_app/dashboard.html', context)
@@ -142,8 +209,8 @@ def contacts_view(request):
             contact.user = request.user
             contact.save()
             
-            # Create audit log
-            AuditLog.objects.create(
+            # Queue audit log
+            AuditBuffer.add(
                 user=request.user,
                 action='CONTACT_ADDED',
                 description=f'Added emergency contact: {contact.name}',
@@ -155,8 +222,12 @@ def contacts_view(request):
     else:
         form = EmergencyContactForm()
     
+    # Evaluated once; the template's counts read the list
+    contacts = list(contacts)
+    
     context = {
         'contacts': contacts,
+        'active_contacts_count': sum(contact.is_active for contact in contacts),
         'form': form
     }
     return render(request, 'safety_app/contacts.html', context)
@@ -171,8 +242,8 @@ def contact_edit_view(request, contact_id):
         if form.is_valid():
             form.save()
             
-            # Create audit log
-            AuditLog.objects.create(
+            # Queue audit log
+            AuditBuffer.add(
                 user=request.user,
                 action='CONTACT_MODIFIED',
                 description=f'Modified emergency contact: {contact.name}',
@@ -213,8 +284,8 @@ def safe_zones_view(request):
             zone.user = request.user
             zone.save()
             
-            # Create audit log
-            AuditLog.objects.create(
+            # Queue audit log
+            AuditBuffer.add(
                 user=request.user,
                 action='SAFE_ZONE_CREATED',
                 description=f'Created safe zone: {zone.name}',
@@ -227,7 +298,7 @@ def safe_zones_view(request):
         form = SafeZoneForm()
     
     context = {
-        'zones': zones,
+        'zones': list(zones),
         'form': form
     }
     return render(request, 'safety_app/safe_zones.html', context)
@@ -237,130 +308,144 @@ def safe_zones_view(request):
 @login_required
 def alert_panel_view(request):
     """Main alert trigger panel"""
-    profile, created = UserProfile.objects.get_or_create(
-        user=request.user,
-        defaults={'phone_number': ''}
-    )
+    profile = request.user.profile
     
-    active_alert = Alert.objects.filter(
-        user=request.user,
-        status__in=['TRIGGERED', 'PENDING_CANCEL', 'DISPATCHED']
-    ).first()
+    active_alert = AlertService().get_active_alert(request.user)
     
     context = {
         'profile': profile,
         'active_alert': active_alert,
-        'has_contacts': request.user.emergency_contacts.filter(is_active=True).exists()
+        'has_contacts': bool(get_active_contacts(request.user.id))
     }
     
     return render(request, 'safety_app/alert_panel.html', context)
 
 
-@login_required
-@require_http_methods(["POST"])
-def trigger_alert_view(request):
+@async_login_required
+@async_require_POST
+async def trigger_alert_view(request):
     """API endpoint to trigger an alert"""
     try:
-        data = json.loads(request.body)
+        data = parse_body(request, TriggerAlertBody)
+        
+        alert_service = AlertService()
         
         # Check if user already has active alert
-        active_alert = Alert.objects.filter(
-            user=request.user,
-            status__in=['TRIGGERED', 'PENDING_CANCEL', 'DISPATCHED']
-        ).first()
+        active_alert = await alert_service.aget_active_alert(request.user)
         
         if active_alert:
-            return JsonResponse({
+            return json_response({
                 'success': False,
                 'message': 'You already have an active alert',
                 'alert_id': str(active_alert.alert_id)
             }, status=400)
         
         # Create alert using AlertService
-        alert_service = AlertService()
-        alert = alert_service.create_alert(
+        alert = await sync_to_async(alert_service.create_alert)(
             user=request.user,
-            latitude=data.get('latitude'),
-            longitude=data.get('longitude'),
-            trigger_method=data.get('trigger_method', 'panic_button'),
+            latitude=data.latitude,
+            longitude=data.longitude,
+            trigger_method=data.trigger_method,
             user_agent=request.META.get('HTTP_USER_AGENT'),
             ip_address=get_client_ip(request)
         )
         
-        return JsonResponse({
+        return json_response({
             'success': True,
             'alert_id': str(alert.alert_id),
             'status': alert.status,
             'message': 'Alert triggered successfully'
         })
         
+    except msgspec.DecodeError as e:
+        return json_response({
+            'success': False,
+            'message': str(e)
+        }, status=400)
     except Exception as e:
-        return JsonResponse({
+        return json_response({
             'success': False,
             'message': str(e)
         }, status=500)
 
 
-@login_required
-@require_http_methods(["POST"])
-def cancel_alert_view(request):
+@async_login_required
+@async_require_POST
+async def cancel_alert_view(request):
     """API endpoint to cancel an alert"""
     try:
-        data = json.loads(request.body)
-        alert_id = data.get('alert_id')
-        reason = data.get('reason', 'User cancelled')
+        data = parse_body(request, CancelAlertBody)
+        alert_id = data.alert_id
+        reason = data.reason
         
-        alert = get_object_or_404(Alert, alert_id=alert_id, user=request.user)
+        alert = await aget_object_or_404(Alert.objects, alert_id=alert_id, user=request.user)
         
         alert_service = AlertService()
-        success = alert_service.cancel_alert(alert, reason)
+        success = await sync_to_async(alert_service.cancel_alert)(alert, reason)
         
         if success:
-            return JsonResponse({
+            return json_response({
                 'success': True,
                 'message': 'Alert cancelled successfully'
             })
         else:
-            return JsonResponse({
+            return json_response({
                 'success': False,
                 'message': 'Failed to cancel alert'
             }, status=400)
             
+    except msgspec.DecodeError as e:
+        return json_response({
+            'success': False,
+            'message': str(e)
+        }, status=400)
     except Exception as e:
-        return JsonResponse({
+        return json_response({
             'success': False,
             'message': str(e)
         }, status=500)
 
 
-@login_required
-@require_http_methods(["POST"])
-def dispatch_alert_view(request):
+@async_login_required
+@async_require_POST
+async def dispatch_alert_view(request):
     """API endpoint to dispatch alert to contacts"""
     try:
-        data = json.loads(request.body)
-        alert_id = data.get('alert_id')
+        data = parse_body(request, DispatchAlertBody)
+        alert_id = data.alert_id
         
-        alert = get_object_or_404(Alert, alert_id=alert_id, user=request.user)
+        alert = await aget_object_or_404(
+            Alert.objects.select_related('user'),
+            alert_id=alert_id,
+            user=request.user
+        )
         
         if alert.status != 'TRIGGERED':
-            return JsonResponse({
+            return json_response({
                 'success': False,
                 'message': 'Alert cannot be dispatched in current status'
             }, status=400)
         
         # Dispatch alert using DispatchService
         dispatch_service = DispatchService()
-        result = dispatch_service.dispatch_alert(alert)
+        result = await sync_to_async(dispatch_service.dispatch_alert)(alert)
         
-        return JsonResponse({
+        # Messages are delivered by Celery workers after this returns
+        return json_response({
             'success': True,
+            'status': 'queued',
+            'alert_id': str(alert.alert_id),
             'contacts_notified': result['contacts_notified'],
             'dispatch_logs': result['dispatch_logs']
         })
         
+    except msgspec.DecodeError as e:
+        return json_response({
+            'success': False,
+            'message': str(e)
+        }, status=400)
     except Exception as e:
-        return JsonResponse({
+        return json_response({
             'success': False,
             'message': str(e)
         }, status=500)
@@ -369,15 +454,21 @@ def dispatch_alert_view(request):
 @login_required
 def alert_history_view(request):
     """View alert history"""
-    alerts = Alert.objects.filter(user=request.user).order_by('-triggered_at')
+    alerts = Alert.objects.filter(user=request.user).only(
+        'alert_id', 'status', 'triggered_at', 'trigger_method',
+        'initial_latitude', 'initial_longitude', 'contacts_notified'
+    ).order_by('-triggered_at')
     
     # Filter by status if provided
     status_filter = request.GET.get('status')
     if status_filter:
         alerts = alerts.filter(status=status_filter)
     
+    page_obj = Paginator(alerts, 25).get_page(request.GET.get('page'))
+    
     context = {
-        'alerts': alerts,
+        'alerts': page_obj,
+        'page_obj': page_obj,
         'status_filter': status_filter
     }
     
@@ -387,7 +478,20 @@ def alert_history_view(request):
 @login_required
 def alert_detail_view(request, alert_id):
     """Detailed view of a specific alert"""
-    alert = get_object_or_404(Alert, alert_id=alert_id, user=request.user)
+    # Tracks and dispatch logs (with their contacts) are loaded up front so the
+    # template's loops don't query per row
+    dispatch_logs_qs = DispatchLog.objects.select_related('contact').only(
+        'id', 'alert', 'channel', 'status', 'sent_at', 'contact__name'
+    )
+    location_tracks_qs = LocationTrack.objects.only('id', 'alert', 'latitude', 'longitude', 'timestamp')
+    alert = get_object_or_404(
+        Alert.objects.select_related('user').prefetch_related(
+            Prefetch('location_tracks', queryset=location_tracks_qs),
+            Prefetch('dispatch_logs', queryset=dispatch_logs_qs)
+        ),
+        alert_id=alert_id,
+        user=request.user
+    )
     location_tracks = alert.location_tracks.all()
     dispatch_logs = alert.dispatch_logs.all()
     audit_logs = alert.audit_logs.all()
@@ -403,9 +507,17 @@ def alert_detail_view(request, alert_id):
 
 
 @login_required
+@cache_control(private=True, max_age=5)
 def monitor_alert_view(request, alert_id):
     """Real-time monitoring view for active alerts"""
-    alert = get_object_or_404(Alert, alert_id=alert_id, user=request.user)
+    # Only the columns the page renders; live data arrives over the websocket
+    alert = get_object_or_404(
+        Alert.objects.only('alert_id', 'status', 'triggered_at', 'user_id'),
+        alert_id=alert_id,
+        user=request.user
+    )
+    # The lookup is scoped to the requesting user, so reuse it for the name
+    alert.user = request.user
     
     context = {
         'alert': alert
@@ -417,10 +529,7 @@ def monitor_alert_view(request, alert_id):
 # Profile Views
 @login_required
 def profile_view(request):
-    profile, created = UserProfile.objects.get_or_create(
-        user=request.user,
-        defaults={'phone_number': ''}
-    )
+    profile = request.user.profile
     
     if request.method == 'POST':
         form = UserProfileForm(request.POST, instance=profile)
@@ -0,0 +1,10 @@
+# wswas/celery.py
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'wswas.settings')
+
+app = Celery('wswas')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
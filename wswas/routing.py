@@ -1,7 +1,9 @@
 from django.urls import re_path
 from safety_app import consumers
 
+UUID_PATTERN = r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}'
+
 websocket_urlpatterns = [
     re_path(r'ws/alert/$', consumers.AlertConsumer.as_asgi()),
-    re_path(r'ws/monitor/(?P<alert_id>[0-9a-f-]+)/$', consumers.MonitorConsumer.as_asgi()),
+    re_path(rf'ws/monitor/(?P<alert_id>{UUID_PATTERN})/$', consumers.MonitorConsumer.as_asgi()),
 ]
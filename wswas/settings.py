@@ -24,6 +24,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'safety_app.middleware.AuditFlushMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -60,21 +61,56 @@ DATABASES = {
     }
 }
 
-# CHANNEL_LAYERS = {
-#     'default': {
-#         'BACKEND': 'channels_redis.core.RedisChannelLayer',
-#         'CONFIG': {
-#             "hosts": [config('REDIS_URL', default='redis://localhost:6379/0')],
-#         },
-#     },
-# }
-
-CHANNEL_LAYERS = {
-    'default': {
-        'BACKEND': 'channels.layers.InMemoryChannelLayer'
+# Redis is required once more than one ASGI worker process is running
+USE_REDIS = config('USE_REDIS', default=False, cast=bool)
+REDIS_URL = config('REDIS_URL', default='redis://localhost:6379/0')
+
+if USE_REDIS:
+    # channels_redis 4.x serializes channel-layer messages with msgpack
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels_redis.core.RedisChannelLayer',
+            'CONFIG': {
+                "hosts": [{
+                    'address': REDIS_URL,
+                    'max_connections': 200,
+                    'socket_keepalive': True,
+                }],
+                "capacity": 1500,
+                "expiry": 10,
+            },
+        },
+    }
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
     }
+else:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels.layers.InMemoryChannelLayer'
+        }
+    }
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# SMS and email dispatch run on Celery workers, one queue per channel.
+# Without Redis there is no broker, so tasks run inline in the request.
+CELERY_BROKER_URL = REDIS_URL
+CELERY_TASK_ALWAYS_EAGER = not USE_REDIS
+CELERY_TASK_ROUTES = {
+    'safety_app.tasks.send_sms_task': {'queue': 'sms'},
+    'safety_app.tasks.send_email_task': {'queue': 'email'},
 }
 
+# Loads user.profile together with request.user
+AUTHENTICATION_BACKENDS = ['safety_app.backends.ProfileModelBackend']
+
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator'},